@@ -2,59 +2,121 @@
 # -*- coding: utf-8 -*-
 import os
 import sys
-import subprocess
 import re
-from pathlib import Path
-from typing import List, Tuple, Dict
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatchcase
+from typing import Dict, List, Sequence, Tuple
+
+try:
+    import clingo
+except ImportError:
+    clingo = None
+
+
+# Number N in an example_N_facts.lp file name
+_EXAMPLE_NUMBER_RE = re.compile(r'example_(\d+)_facts\.lp')
+
+# Color constants the runner accepts, as in the old name(x, y, color) regex
+_WORD_RE = re.compile(r'\w+')
+
+# Create color mapping for terminal display
+COLOR_MAP = {
+    'cyan': '\033[96m■\033[0m',
+    'red': '\033[91m■\033[0m',
+    'green': '\033[92m■\033[0m',
+    'yellow': '\033[93m■\033[0m',
+    'blue': '\033[94m■\033[0m',
+    'magenta': '\033[95m■\033[0m',
+    'white': '\033[97m■\033[0m',
+    'black': '\033[90m■\033[0m'
+}
+
+# Grid color indices: 0 is an empty cell, 1.. follow COLOR_MAP, and the last
+# index is shared by every color without a terminal code
+_COLOR_IDX = {name: idx for idx, name in enumerate(COLOR_MAP, 1)}
+_UNKNOWN_COLOR_IDX = len(COLOR_MAP) + 1
+_CELL_CODES = [b". "] + [code.encode() + b" " for code in COLOR_MAP.values()] + [b"? "]
+
+# Pre-encoded pieces of a rendered grid
+_COLOR_BYTES = {name: code.encode() for name, code in COLOR_MAP.items()}
+_GRID_HEADER = ("  " + "".join(f"{x} " for x in range(11)) + "\n").encode()  # Column numbers 0 to 10
+_ROW_LABELS = [f"{y:2} ".encode() for y in range(11)]  # Right-align single digits
 
 
 def find_example_files(directory: str) -> List[str]:
     """Find all example_N_facts.lp files in the given directory."""
-    dir_path = Path(directory)
-    if not dir_path.exists():
+    if not os.path.exists(directory):
         print(f"Error: Directory '{directory}' does not exist.")
         sys.exit(1)
     
-    example_files = sorted(dir_path.glob("example_*_facts.lp"))
-    return [str(f) for f in example_files]
+    with os.scandir(directory) as entries:
+        example_files = [entry.path for entry in entries
+                         if fnmatchcase(entry.name, "example_*_facts.lp") and entry.is_file()]
+    # Order by example number so example_10 comes after example_2
+    example_files.sort(key=_example_sort_key)
+    return example_files
 
 
-def run_clingo(facts_file: str, task_file: str) -> str:
-    """Run clingo with the given facts and task files."""
-    try:
-        process = subprocess.Popen(
-            ["clingo", facts_file, task_file, "0"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        stdout, stderr = process.communicate()
-        
-        # print("Clingo stdout:")
-        # print(stdout)
-        # print("\nClingo stderr:")
-        # print(stderr)
-            
-        return stdout
-    except FileNotFoundError:
-        print("Error: clingo not found. Please ensure clingo is installed and in your PATH.")
-        sys.exit(1)
+def _example_sort_key(path: str) -> Tuple[int, int, str]:
+    """Sort key putting numbered examples first, in numeric order."""
+    name = os.path.basename(path)
+    match = _EXAMPLE_NUMBER_RE.fullmatch(name)
+    if match is None:
+        return 1, 0, name
+    return 0, int(match.group(1)), name
+
+
+def _is_natural(symbol: "clingo.Symbol") -> bool:
+    """Check whether a symbol is a non-negative integer."""
+    return symbol.type == clingo.SymbolType.Number and symbol.number >= 0
 
 
-def parse_cells(clingo_output: str, predicate_name: str) -> List[Tuple[int, int, str]]:
-    """Parse cell predicates from clingo output."""
-    cells = []
+def run_clingo(facts_file: str, task_file: str,
+               predicate_names: Sequence[str]) -> Tuple[str, Dict[str, List[Tuple[int, int, str]]]]:
+    """Run clingo with the given facts and task files.
+
+    Solves in-process through the clingo Python package. Returns the solve
+    status and the cells found for each predicate name.
+    """
+    cells: Dict[str, List[Tuple[int, int, str]]] = {name: [] for name in predicate_names}
+    
+    def on_model(model: "clingo.Model") -> None:
+        # Read x, y and color straight off the shown symbols
+        for symbol in model.symbols(shown=True):
+            if symbol.type != clingo.SymbolType.Function or symbol.name not in cells:
+                continue
+            # Only name(x, y, color) with x, y >= 0 and a plain word color
+            if len(symbol.arguments) != 3:
+                continue
+            x, y, color = symbol.arguments
+            if not (_is_natural(x) and _is_natural(y)):
+                continue
+            if color.type == clingo.SymbolType.Function and not color.arguments \
+                    and not color.negative and _WORD_RE.fullmatch(color.name):
+                color_name = color.name
+            elif _is_natural(color):
+                color_name = str(color.number)
+            else:
+                continue
+            cells[symbol.name].append((x.number, y.number, color_name))
     
-    # Look for lines containing cell predicates
-    for line in clingo_output.split('\n'):
-        # Match cell(x, y, color) predicates
-        pattern = rf'{predicate_name}\((\d+),(\d+),(\w+)\)'
-        matches = re.findall(pattern, line)
-        for match in matches:
-            x, y, color = match
-            cells.append((int(x), int(y), color))
+    # clingo's default logger reports syntax errors and warnings on stderr
+    ctl = clingo.Control(["0"])
+    try:
+        ctl.load(task_file)
+        ctl.load(facts_file)
+        ctl.ground([("base", [])])
+        result = ctl.solve(on_model=on_model)
+    except RuntimeError:
+        result = None
     
-    return cells
+    if result is None or result.unknown:
+        status = "UNKNOWN"
+    elif result.unsatisfiable:
+        status = "UNSATISFIABLE"
+    else:
+        status = "SATISFIABLE"
+    return status, cells
 
 
 def display_grid(cells: List[Tuple[int, int, str]], grid_title: str = "Grid") -> None:
@@ -63,44 +125,60 @@ def display_grid(cells: List[Tuple[int, int, str]], grid_title: str = "Grid") ->
         print(f"No cells found for {grid_title}.")
         return
     
-    # Create color mapping for terminal display
-    color_map = {
-        'cyan': '\033[96m■\033[0m',
-        'red': '\033[91m■\033[0m',
-        'green': '\033[92m■\033[0m',
-        'yellow': '\033[93m■\033[0m',
-        'blue': '\033[94m■\033[0m',
-        'magenta': '\033[95m■\033[0m',
-        'white': '\033[97m■\033[0m',
-        'black': '\033[90m■\033[0m'
-    }
-    
-    # Build a dictionary for quick lookup
-    cell_dict = {(x, y): color for x, y, color in cells}
-    
-    # Display grid
-    print(f"\n{grid_title}:")
-    print("  ", end="")
-    for x in range(11):  # 0 to 10
-        print(f"{x} ", end="")
-    print()
+    # Flat 11x11 grid of color indices, addressed as y * 11 + x; 0 is empty
+    grid = bytearray(121)
+    for x, y, color in cells:
+        if not (0 <= x <= 10 and 0 <= y <= 10):
+            continue
+        grid[y * 11 + x] = _COLOR_IDX.get(color, _UNKNOWN_COLOR_IDX)
     
+    # Display grid, assembled as bytes and written in one go
+    parts = [b"\n", grid_title.encode(), b":\n", _GRID_HEADER]
     for y in range(11):  # 0 to 10
-        print(f"{y:2}", end=" ")  # Right-align single digits
-        for x in range(11):
-            if (x, y) in cell_dict:
-                color = cell_dict[(x, y)]
-                print(color_map.get(color, '?'), end=" ")
-            else:
-                print(". ", end="")
-        print()
+        parts.append(_ROW_LABELS[y])
+        parts.extend(_CELL_CODES[idx] for idx in grid[y * 11:y * 11 + 11])
+        parts.append(b"\n")
     
     # Display legend
     used_colors = set(color for _, _, color in cells)
     if used_colors:
-        print("\nLegend:")
+        parts.append(b"\nLegend:\n")
         for color in sorted(used_colors):
-            print(f"  {color_map.get(color, '?')} = {color}")
+            parts.extend((b"  ", _COLOR_BYTES.get(color, b"?"), b" = ", color.encode(), b"\n"))
+    
+    payload = b"".join(parts)
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        # Text-only streams such as io.StringIO have no byte buffer
+        sys.stdout.write(payload.decode())
+        return
+    # Anything already printed must reach the terminal before the raw bytes
+    sys.stdout.flush()
+    buffer.write(payload)
+
+
+def report_example(facts_file: str, status: str,
+                   cells: Dict[str, List[Tuple[int, int, str]]]) -> None:
+    """Display the clingo result for a single example file."""
+    print(f"\n{'='*60}")
+    print(f"Processing: {os.path.basename(facts_file)}")
+    print(f"{'='*60}")
+    
+    # Check if solution was found
+    if status == "UNSATISFIABLE":
+        print("No solution found (UNSATISFIABLE)")
+        return
+    elif status != "SATISFIABLE":
+        print("Warning: Could not determine if solution is satisfiable")
+    
+    # Display input grid
+    input_cells = cells["in_cell"]
+    if input_cells:
+        display_grid(input_cells, "INPUT Grid")
+    
+    # Display output grid
+    output_cells = cells["out_cell"]
+    display_grid(output_cells, "OUTPUT Grid")
 
 
 def main():
@@ -115,34 +193,24 @@ def main():
         print(f"Error: task.lp not found in directory '{directory}'")
         sys.exit(1)
     
+    if clingo is None:
+        print("Error: clingo not found. Please ensure the clingo Python package is installed.")
+        sys.exit(1)
+    
     example_files = find_example_files(directory)
     
     if not example_files:
         print(f"No example_*_facts.lp files found in directory '{directory}'")
         sys.exit(1)
     
-    for facts_file in example_files:
-        print(f"\n{'='*60}")
-        print(f"Processing: {os.path.basename(facts_file)}")
-        print(f"{'='*60}")
-        
-        clingo_output = run_clingo(facts_file, task_file)
-        
-        # Check if solution was found
-        if "UNSATISFIABLE" in clingo_output:
-            print("No solution found (UNSATISFIABLE)")
-            continue
-        elif "SATISFIABLE" not in clingo_output:
-            print("Warning: Could not determine if solution is satisfiable")
-        
-        # Parse and display input grid
-        input_cells = parse_cells(clingo_output, "in_cell")
-        if input_cells:
-            display_grid(input_cells, "INPUT Grid")
-        
-        # Parse and display output grid
-        output_cells = parse_cells(clingo_output, "out_cell")
-        display_grid(output_cells, "OUTPUT Grid")
+    # clingo is single-threaded, so solve the examples side by side and
+    # report them in file order as each one finishes; each example is
+    # grounded and solved in-process, with no clingo fork/exec per example
+    with ProcessPoolExecutor() as executor:
+        futures = [executor.submit(run_clingo, facts_file, task_file, ("in_cell", "out_cell"))
+                   for facts_file in example_files]
+        for facts_file, future in zip(example_files, futures):
+            report_example(facts_file, *future.result())
 
 
 if __name__ == "__main__":